@@ -1,60 +1,137 @@
-from pyrogram import Client
+from pyrogram import Client, raw, utils
+from pyrogram.errors import FloodWait, PeerIdInvalid, SlowmodeWait, UsernameInvalid, UsernameNotOccupied
+from collections import deque
+from dataclasses import dataclass
 from datetime import datetime, timedelta
 import asyncio
-import json
+import ctypes
+import gc
+import orjson
 import os
+import signal
+import sys
+import threading
+import time
 from dotenv import load_dotenv
 from typing import List, Dict
 
 # Load environment variables
 load_dotenv()
 
+@dataclass(frozen=True, slots=True)
+class Cfg:
+    """API credentials loaded from the environment"""
+    api_id: int
+    api_hash: str
+
+def load_config() -> Cfg:
+    """Read API credentials from the environment, with a clear error if they're missing"""
+    api_id = os.getenv('API_ID')
+    api_hash = os.getenv('API_HASH')
+    if not api_id or not api_hash:
+        raise RuntimeError("API_ID/API_HASH must be set in .env")
+    try:
+        return Cfg(int(api_id), api_hash)
+    except ValueError:
+        raise RuntimeError(f"API_ID must be a number, got {api_id!r}") from None
+
+# Telegram limits: about 1 message per second and 20 messages per minute per account
+MIN_SEND_INTERVAL = 1.0
+MAX_SENDS_PER_MINUTE = 20
+SEND_ATTEMPTS = 3
+# Longer waits are left for the next cycle rather than stalling this one
+MAX_RETRY_WAIT = 300
+SAVE_DELAY = 0.5
+MAX_SEND_WORKERS = 8
+SEND_INTERVAL = timedelta(hours=3)
+SESSION_SUFFIX = '.session'
+SUFFIX_LEN = len(SESSION_SUFFIX)
+
+# glibc handle used to return freed memory to the OS between send cycles
+_purge_lib = None
+if sys.platform.startswith('linux'):
+    try:
+        _purge_lib = ctypes.CDLL("libc.so.6")
+        if not hasattr(_purge_lib, 'malloc_trim'):
+            _purge_lib = None
+    except OSError:
+        pass
+
 class TelegramManager:
     def __init__(self):
-        self.api_id = os.getenv('API_ID')
-        self.api_hash = os.getenv('API_HASH')
+        # Read API credentials once at startup
+        self.cfg = load_config()
         self.sessions_file = 'sessions.json'
+        self._base_dir = os.path.dirname(os.path.abspath(__file__))
+        self._sessions_dir = os.path.join(self._base_dir, "sessions")
+        self._sessions_dir_exists = os.path.isdir(self._sessions_dir)
         self.clients = []
+        self._client_locks = {}
+        self._send_times = {}
+        self._wake = asyncio.Event()
+        self._save_handle = None
         self.sessions_data = self.load_sessions()
+        self._known_sessions = {acc['session_name'] for acc in self.sessions_data['accounts']}
+        self._peers = {}
+        # Older sessions.json files may contain recipients saved before cleanup was added
+        for target in self.sessions_data['targets']:
+            target['recipient'] = self._clean_recipient(target['recipient'])
 
     def load_sessions(self) -> Dict:
         """Load saved sessions data from JSON file"""
         try:
-            with open(self.sessions_file, 'r') as f:
-                return json.load(f)
+            with open(self.sessions_file, 'rb') as f:
+                return orjson.loads(f.read())
         except FileNotFoundError:
             return {"accounts": [], "targets": []}
 
     def save_sessions(self):
-        """Save sessions data to JSON file"""
-        with open(self.sessions_file, 'w') as f:
-            json.dump(self.sessions_data, f, indent=4)
+        """Schedule a save of sessions data, coalescing rapid changes into one write"""
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            self._flush()
+            return
+        if self._save_handle is None:
+            self._save_handle = loop.call_later(SAVE_DELAY, self._flush)
+
+    def _flush(self):
+        """Atomically write sessions data to JSON file"""
+        if self._save_handle is not None:
+            self._save_handle.cancel()
+            self._save_handle = None
+        tmp_file = f"{self.sessions_file}.tmp"
+        with open(tmp_file, 'wb') as f:
+            f.write(orjson.dumps(self.sessions_data, option=orjson.OPT_INDENT_2))
+        os.replace(tmp_file, self.sessions_file)
 
     def detect_existing_sessions(self):
-        """Detect all .session files in the current directory and subdirectories"""
+        """Detect all .session files in the current directory and the sessions folder"""
         session_files = []
-        current_dir = os.path.dirname(os.path.abspath(__file__))
-        sessions_dir = os.path.join(current_dir, "sessions")
-        print(f"Searching for sessions in: {current_dir} and {sessions_dir}")
+        print(f"Searching for sessions in: {self._base_dir} and {self._sessions_dir}")
         
         # Search in both main directory and sessions folder
-        search_dirs = [current_dir]
-        if os.path.exists(sessions_dir):
-            search_dirs.append(sessions_dir)
+        search_dirs = [self._base_dir]
+        if self._sessions_dir_exists:
+            search_dirs.append(self._sessions_dir)
         
+        # Session files only live at the top level of these directories
         for search_dir in search_dirs:
-            for root, dirs, files in os.walk(search_dir):
-                for file in files:
-                    if file.endswith('.session'):
-                        session_name = file.replace('.session', '')
-                        # Skip temp_session
-                        if session_name == 'temp_session':
-                            continue
-                        if session_name not in [acc['session_name'] for acc in self.sessions_data['accounts']]:
-                            self.sessions_data['accounts'].append({
-                                "session_name": session_name
-                            })
-                            session_files.append(session_name)
+            with os.scandir(search_dir) as entries:
+                for entry in entries:
+                    name = entry.name
+                    if not name.endswith(SESSION_SUFFIX) or not entry.is_file():
+                        continue
+                    session_name = name[:-SUFFIX_LEN]
+                    # Skip temp_session
+                    if session_name == 'temp_session':
+                        continue
+                    if session_name not in self._known_sessions:
+                        self._known_sessions.add(session_name)
+                        self.sessions_data['accounts'].append({
+                            "session_name": session_name
+                        })
+                        session_files.append(session_name)
         
         if session_files:
             print(f"Found existing sessions: {', '.join(session_files)}")
@@ -63,43 +140,107 @@ class TelegramManager:
             print("No existing session files found")
         return session_files
 
+    def _session_path(self, session_name: str) -> str:
+        """Return the session path, preferring the sessions directory if the file is there"""
+        if self._sessions_dir_exists and os.path.exists(
+            os.path.join(self._sessions_dir, f"{session_name}{SESSION_SUFFIX}")
+        ):
+            return os.path.join("sessions", session_name)
+        return session_name
+
+    def _new_client(self, session_path: str) -> Client:
+        """Create a send-only client with its session stored relative to the script directory"""
+        return Client(
+            session_path,
+            api_id=self.cfg.api_id,
+            api_hash=self.cfg.api_hash,
+            workdir=self._base_dir,
+            no_updates=True
+        )
+
+    async def _start_session(self, client: Client, authorized: bool):
+        """Finish starting a connected client, logging it in first if needed"""
+        try:
+            if not authorized:
+                await client.authorize()
+            client.me = await client.get_me()
+            await client.initialize()
+        except BaseException:
+            await client.disconnect()
+            raise
+
+    def _unique_session_name(self, session_name: str) -> str:
+        """Return a session name not used by a known account or a session file in either directory"""
+        base = session_name or "account"
+        candidate, n = base, 1
+        while candidate == 'temp_session' or candidate in self._known_sessions or any(
+            os.path.exists(os.path.join(directory, f"{candidate}{SESSION_SUFFIX}"))
+            for directory in (self._base_dir, self._sessions_dir)
+        ):
+            n += 1
+            candidate = f"{base}_{n}"
+        return candidate
+
+    async def _discard_temp_session(self, client: Client):
+        """Log out the temporary session and remove its files"""
+        try:
+            # Also revokes the login on Telegram's side and deletes the session file
+            await client.log_out()
+        except Exception as e:
+            print(f"Failed to log out temporary session: {str(e)}")
+            if client.is_connected:
+                await client.stop()
+        for suffix in (SESSION_SUFFIX, f"{SESSION_SUFFIX}-journal"):
+            temp_file = os.path.join(self._base_dir, f"temp_session{suffix}")
+            if os.path.exists(temp_file):
+                os.remove(temp_file)
+
     async def add_new_account(self):
         """Interactive account addition"""
         # Create client with temporary session name
-        client = Client(
-            "temp_session",
-            api_id=self.api_id,
-            api_hash=self.api_hash
-        )
+        client = self._new_client("temp_session")
         
         try:
             await client.start()
             me = await client.get_me()
             
+            # Adding an account that is already loaded would send every message twice
+            if any(getattr(c.me, 'id', None) == me.id for c in self.clients):
+                print(f"Account {me.first_name} is already added, skipping")
+                await self._discard_temp_session(client)
+                return None
+            
             # Use username if available, otherwise use first_name
             session_name = me.username or me.first_name
             # Ensure session name is valid for file system
             session_name = "".join(c for c in session_name if c.isalnum() or c in ('-', '_'))
+            # Never overwrite a different account's session file
+            unique_name = self._unique_session_name(session_name)
+            if unique_name != session_name:
+                print(f"Session name {session_name!r} is already in use, saving as {unique_name!r}")
+                session_name = unique_name
             
             # Stop the temporary client
             await client.stop()
             
+            # Rename the temporary session file so the new client reuses its auth key
+            for suffix in (SESSION_SUFFIX, f"{SESSION_SUFFIX}-journal"):
+                temp_file = os.path.join(self._base_dir, f"temp_session{suffix}")
+                if os.path.exists(temp_file):
+                    os.replace(temp_file, os.path.join(self._base_dir, f"{session_name}{suffix}"))
+            
             # Create new client with proper session name
-            client = Client(
-                session_name,
-                api_id=self.api_id,
-                api_hash=self.api_hash
-            )
+            client = self._new_client(session_name)
             await client.start()
             
             print(f"Successfully logged in as {me.first_name}")
             
             # Save account info
-            if session_name not in [acc['session_name'] for acc in self.sessions_data['accounts']]:
-                self.sessions_data['accounts'].append({
-                    "session_name": session_name
-                })
-                self.save_sessions()
+            self._known_sessions.add(session_name)
+            self.sessions_data['accounts'].append({
+                "session_name": session_name
+            })
+            self.save_sessions()
             
             self.clients.append(client)
             return client
@@ -108,16 +249,99 @@ class TelegramManager:
             print(f"Failed to initialize client: {str(e)}")
             return None
 
+    async def _ainput(self, prompt: str) -> str:
+        """Read user input in a daemon thread so an abandoned prompt doesn't block exit"""
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        
+        def resolve(result, error):
+            if future.done():
+                return
+            if error is not None:
+                future.set_exception(error)
+            else:
+                future.set_result(result)
+        
+        def read():
+            result, error = None, None
+            try:
+                # Plain input() shares sys.stdin's buffer with pyrogram's own login prompts
+                result = input(prompt)
+            except BaseException as e:
+                error = e
+            try:
+                loop.call_soon_threadsafe(resolve, result, error)
+            except RuntimeError:
+                # The loop already closed after a Ctrl+C
+                pass
+        
+        threading.Thread(target=read, daemon=True).start()
+        return await future
+
+    @staticmethod
+    def _clean_recipient(target: str) -> str:
+        """Strip a leading @ or t.me/ link prefix from a recipient"""
+        if target.startswith('@'):
+            return target[1:]
+        if 't.me/' in target:
+            return target.split('t.me/')[-1]
+        return target
+
+    @staticmethod
+    def _peer_to_chat_id(peer, recipient: str):
+        """Convert a resolved InputPeer to the numeric chat id pyrogram looks up locally"""
+        if isinstance(peer, raw.types.InputPeerUser):
+            return peer.user_id
+        if isinstance(peer, raw.types.InputPeerChat):
+            return -peer.chat_id
+        if isinstance(peer, raw.types.InputPeerChannel):
+            return utils.get_channel_id(peer.channel_id)
+        return recipient
+
+    def _client_lock(self, client: Client) -> asyncio.Semaphore:
+        """Return the lock that serializes requests made by one client"""
+        return self._client_locks.setdefault(id(client), asyncio.Semaphore(1))
+
+    async def _resolve_chat_id(self, client: Client, recipient: str):
+        """Resolve a recipient to a chat id once per client, falls back to the raw recipient"""
+        key = (id(client), recipient)
+        if key in self._peers:
+            return self._peers[key]
+        # Username lookups have tight flood limits, so they go through the same pacing as sends
+        async with self._client_lock(client):
+            if key in self._peers:
+                return self._peers[key]
+            await self._wait_for_slot(client)
+            try:
+                peer = await client.resolve_peer(recipient)
+            except FloodWait as e:
+                print(f"Flood wait while resolving {recipient}, will resolve it later: {str(e)}")
+                return recipient
+            except (PeerIdInvalid, UsernameNotOccupied, UsernameInvalid, KeyError):
+                # Invite links and unknown names can't be resolved, send by name instead
+                chat_id = recipient
+            else:
+                chat_id = self._peer_to_chat_id(peer, recipient)
+            self._peers[key] = chat_id
+        return chat_id
+
+    async def resolve_targets(self):
+        """Resolve every target for every client ahead of the first send cycle"""
+        await asyncio.gather(
+            *(
+                self._resolve_chat_id(client, target['recipient'])
+                for client in self.clients
+                for target in self.sessions_data['targets']
+            ),
+            return_exceptions=True
+        )
+
     async def add_target(self):
         """Interactive target addition"""
-        target = input("Enter target username/group/channel (with or without @) or link: ")
-        message = input("Enter the message to send: ")
+        target = await self._ainput("Enter target username/group/channel (with or without @) or link: ")
+        message = await self._ainput("Enter the message to send: ")
         
-        # Clean up the target input
-        if target.startswith('@'):
-            target = target[1:]
-        elif 't.me/' in target:
-            target = target.split('t.me/')[-1]
+        target = self._clean_recipient(target)
         
         self.sessions_data['targets'].append({
             "recipient": target,
@@ -127,33 +351,146 @@ class TelegramManager:
         print(f"Added new target: {target}")
 
     async def send_message(self, client: Client, recipient: str, message: str):
-        """Send message to specified recipient"""
+        """Send message to specified recipient, returns (ok, exception)"""
         try:
-            await client.send_message(recipient, message)
+            print(f"\nSending message to {recipient}...")
+            chat_id = await self._resolve_chat_id(client, recipient)
+            await self._post(client, chat_id, message)
             print(f"Message sent successfully to {recipient}")
+            return True, None
         except Exception as e:
             print(f"Failed to send message: {str(e)}")
+            return False, e
+
+    async def _post(self, client: Client, chat_id, message: str):
+        """Send a single message within the rate limits, returns the sent message"""
+        for attempt in range(SEND_ATTEMPTS):
+            # Telegram serializes writes per session, so only one send per client at a time
+            async with self._client_lock(client):
+                await self._wait_for_slot(client)
+                try:
+                    return await client.send_message(chat_id, message)
+                except FloodWait as e:
+                    # Flood waits cover the whole account, so keep holding the client
+                    await self._retry_wait(chat_id, e, attempt)
+                    continue
+                except SlowmodeWait as e:
+                    slowmode = e
+            # Slow mode only covers this chat, so let the client send elsewhere meanwhile
+            await self._retry_wait(chat_id, slowmode, attempt)
+
+    @staticmethod
+    async def _retry_wait(chat_id, error, attempt: int):
+        """Sleep before retrying a rate limited send, re-raises the error if it's time to give up"""
+        if attempt == SEND_ATTEMPTS - 1 or error.value > MAX_RETRY_WAIT:
+            print(f"Giving up on {chat_id} after {attempt + 1} attempts: {str(error)}")
+            raise error
+        # Wait as long as Telegram asks, backing off further on each retry
+        delay = error.value + 0.5 * 2 ** attempt
+        print(f"Rate limited for {error.value}s, retrying {chat_id} in {delay:.1f}s...")
+        await asyncio.sleep(delay)
+
+    async def _wait_for_slot(self, client: Client):
+        """Pace sends per client to stay under Telegram's rate limits"""
+        sent = self._send_times.setdefault(id(client), deque(maxlen=MAX_SENDS_PER_MINUTE))
+        if sent:
+            await asyncio.sleep(max(0, MIN_SEND_INTERVAL - (time.monotonic() - sent[-1])))
+        if len(sent) == MAX_SENDS_PER_MINUTE:
+            await asyncio.sleep(max(0, 60 - (time.monotonic() - sent[0])))
+        sent.append(time.monotonic())
+
+    async def _send_cycle(self) -> List:
+        """Send every target from every client, returns the result of each send"""
+        queue = asyncio.Queue()
+        # Interleave clients so workers spread across sessions instead of queueing on one
+        for target in self.sessions_data['targets']:
+            for client in self.clients:
+                queue.put_nowait((client, target['recipient'], target['message']))
+        
+        results = []
+        
+        async def worker():
+            while True:
+                item = await queue.get()
+                try:
+                    results.append(await self.send_message(*item))
+                except Exception as e:
+                    results.append(e)
+                finally:
+                    queue.task_done()
+        
+        workers = [
+            asyncio.create_task(worker())
+            for _ in range(max(1, min(len(self.clients), MAX_SEND_WORKERS)))
+        ]
+        try:
+            await queue.join()
+        finally:
+            for task in workers:
+                task.cancel()
+            await asyncio.gather(*workers, return_exceptions=True)
+        return results
 
     async def scheduled_message_sender(self):
         """Main loop for sending scheduled messages"""
+        # SIGHUP triggers an immediate send cycle
+        if hasattr(signal, 'SIGHUP'):
+            asyncio.get_running_loop().add_signal_handler(signal.SIGHUP, self._wake.set)
+        
+        interval = SEND_INTERVAL.total_seconds()
+        deadline = time.time()
         while True:
-            # Send messages immediately
-            for client in self.clients:
-                for target in self.sessions_data['targets']:
-                    try:
-                        print(f"\nSending message to {target['recipient']}...")
-                        await self.send_message(
-                            client,
-                            target['recipient'],
-                            target['message']
-                        )
-                    except Exception as e:
-                        print(f"Error in scheduled sender: {str(e)}")
+            self._wake.clear()
+            # Send messages immediately through a pool of workers
+            results = await self._send_cycle()
+            for result in results:
+                if isinstance(result, BaseException):
+                    print(f"Error in scheduled sender: {str(result)}")
+            sent = sum(1 for r in results if isinstance(r, tuple) and r[0])
+            print(f"\nSent {sent}/{len(results)} messages this cycle")
             
-            next_time = datetime.now() + timedelta(hours=3)
-            print(f"\nNext messages will be sent in 3 hours at {next_time.strftime('%H:%M:%S')}")
-            # Wait for 3 hours before next round
-            await asyncio.sleep(3 * 60 * 60)
+            # Release memory from this cycle before the long wait
+            gc.collect()
+            if _purge_lib is not None:
+                _purge_lib.malloc_trim(0)
+            
+            # Keep cycles on fixed slots from the first one, skipping any slot already missed
+            now = time.time()
+            deadline += interval
+            if deadline <= now:
+                deadline += (now - deadline) // interval * interval + interval
+            next_time = datetime.fromtimestamp(deadline)
+            hours = (deadline - now) / 3600
+            print(f"\nNext messages will be sent in {hours:.1f} hours at {next_time.strftime('%H:%M:%S')}")
+            # Wait until the deadline or until woken up early
+            await self._wait_until(deadline)
+            if self._wake.is_set():
+                # An early wake-up starts the schedule again from now
+                deadline = time.time()
+
+    async def _wait_until(self, deadline: float):
+        """Sleep until an absolute wall-clock deadline, returns early if woken"""
+        wake = asyncio.create_task(self._wake.wait())
+        try:
+            while not self._wake.is_set():
+                remaining = deadline - time.time()
+                if remaining <= 0:
+                    break
+                # Sleep in short steps so clock jumps do not delay the deadline
+                sleeper = asyncio.create_task(asyncio.sleep(min(remaining, 60)))
+                await asyncio.wait({wake, sleeper}, return_when=asyncio.FIRST_COMPLETED)
+                sleeper.cancel()
+        finally:
+            wake.cancel()
+
+    def _record_start(self, account: Dict, client: Client, result, bad: set):
+        """Keep a started client, or mark its session as failed"""
+        if isinstance(result, BaseException):
+            print(f"Failed to load session {account['session_name']}: {str(result)}")
+            bad.add(account['session_name'])
+        else:
+            self.clients.append(client)
+            print(f"Successfully loaded session: {account['session_name']}")
 
     async def setup(self):
         """Initial setup and configuration"""
@@ -164,37 +501,68 @@ class TelegramManager:
         # Detect existing sessions
         self.detect_existing_sessions()
         
-        # Initialize existing accounts
-        for account in self.sessions_data['accounts']:
-            try:
-                # Check if session file is in sessions directory
-                sessions_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), "sessions")
-                if os.path.exists(os.path.join(sessions_dir, f"{account['session_name']}.session")):
-                    session_path = os.path.join("sessions", account['session_name'])
-                else:
-                    session_path = account['session_name']
-                
-                client = Client(
-                    session_path,
-                    api_id=self.api_id,
-                    api_hash=self.api_hash,
-                    no_updates=True
-                )
-                
-                # Skip temp_session as it's just temporary
-                if account['session_name'] == 'temp_session':
-                    continue
-                    
-                # Start the client without asking for phone number if already authorized
-                await client.start()
-                self.clients.append(client)
-                print(f"Successfully loaded session: {account['session_name']}")
-                    
-            except Exception as e:
-                print(f"Failed to load session {account['session_name']}: {str(e)}")
-                # Remove failed session from accounts
-                self.sessions_data['accounts'].remove(account)
-                self.save_sessions()
+        # Initialize existing accounts, skipping temp_session as it's just temporary
+        accounts = [
+            account for account in self.sessions_data['accounts']
+            if account['session_name'] != 'temp_session'
+        ]
+        clients = [
+            self._new_client(self._session_path(account['session_name']))
+            for account in accounts
+        ]
+        
+        # Connect all clients concurrently to find out which sessions are already logged in
+        connected = await asyncio.gather(
+            *(client.connect() for client in clients),
+            return_exceptions=True
+        )
+        
+        bad = set()
+        authorized, pending = [], []
+        for account, client, result in zip(accounts, clients, connected):
+            if isinstance(result, BaseException):
+                print(f"Failed to load session {account['session_name']}: {str(result)}")
+                bad.add(account['session_name'])
+            elif result:
+                authorized.append((account, client))
+            else:
+                pending.append((account, client))
+        
+        # Logged in sessions finish starting concurrently
+        results = await asyncio.gather(
+            *(self._start_session(client, True) for _, client in authorized),
+            return_exceptions=True
+        )
+        # Track started clients right away so run() stops them if a later prompt is interrupted
+        for (account, client), result in zip(authorized, results):
+            self._record_start(account, client, result, bad)
+        
+        # The rest prompt for a phone number and code, so log them in one at a time
+        try:
+            while pending:
+                account, client = pending.pop(0)
+                print(f"\nSession {account['session_name']} is not logged in yet")
+                try:
+                    result = await self._start_session(client, False)
+                except Exception as e:
+                    result = e
+                self._record_start(account, client, result, bad)
+        except BaseException:
+            # Interrupted mid-login, close the sessions that never got their turn
+            await asyncio.gather(
+                *(client.disconnect() for _, client in pending),
+                return_exceptions=True
+            )
+            raise
+        
+        # Remove failed sessions from accounts in a single pass
+        if bad:
+            self.sessions_data['accounts'] = [
+                account for account in self.sessions_data['accounts']
+                if account['session_name'] not in bad
+            ]
+            self._known_sessions -= bad
+            self.save_sessions()
         
         # Only ask to add new account if no existing accounts were successfully loaded
         if not self.clients:
@@ -202,7 +570,7 @@ class TelegramManager:
             await self.add_new_account()
         else:
             while True:
-                add_more = input("\nDo you want to add another account? (y/N): ").lower()
+                add_more = (await self._ainput("\nDo you want to add another account? (y/N): ")).lower()
                 if add_more != 'y':
                     break
                 await self.add_new_account()
@@ -213,26 +581,74 @@ class TelegramManager:
             await self.add_target()
         
         while True:
-            add_more = input("\nDo you want to add another target? (y/N): ").lower()
+            add_more = (await self._ainput("\nDo you want to add another target? (y/N): ")).lower()
             if add_more != 'y':
                 break
             await self.add_target()
 
     async def run(self):
         """Main entry point to run the Telegram manager"""
+        # SIGTERM (e.g. from systemd) shuts down cleanly like Ctrl+C
+        if hasattr(signal, 'SIGTERM'):
+            try:
+                asyncio.get_running_loop().add_signal_handler(
+                    signal.SIGTERM, asyncio.current_task().cancel
+                )
+            except NotImplementedError:
+                pass
+        
         try:
             await self.setup()
+            await self.resolve_targets()
             print("\nStarting scheduled message sender...")
             print("Press Ctrl+C to stop the program")
             print("="*50)
             await self.scheduled_message_sender()
-        except KeyboardInterrupt:
+        except (KeyboardInterrupt, asyncio.CancelledError):
             print("\nShutting down Telegram manager")
         finally:
-            for client in self.clients:
-                await client.stop()
+            if self._save_handle is not None:
+                self._flush()
+            # Stop all clients concurrently, ignoring further Ctrl+C or SIGTERM so sessions close cleanly
+            self._ignore_interrupts()
+            await asyncio.gather(
+                *(client.stop() for client in self.clients),
+                return_exceptions=True
+            )
+
+    @staticmethod
+    def _ignore_interrupts():
+        """Replace the Ctrl+C and SIGTERM handlers with ones that do nothing"""
+        # A no-op handler rather than none, since SIGTERM's default would kill the process
+        loop = asyncio.get_running_loop()
+        for name in ('SIGINT', 'SIGTERM'):
+            if not hasattr(signal, name):
+                continue
+            signum = getattr(signal, name)
+            try:
+                loop.add_signal_handler(signum, lambda: None)
+            except NotImplementedError:
+                signal.signal(signum, signal.SIG_IGN)
 
 if __name__ == "__main__":
+    # Use uvloop for a faster event loop when it is available
+    try:
+        import uvloop
+    except ImportError:
+        uvloop = None
+    
     # Create and run the Telegram manager
-    manager = TelegramManager()
-    asyncio.run(manager.run())
+    try:
+        manager = TelegramManager()
+    except RuntimeError as e:
+        sys.exit(str(e))
+    
+    if uvloop is None:
+        asyncio.run(manager.run())
+    elif sys.version_info >= (3, 11):
+        with asyncio.Runner(loop_factory=uvloop.new_event_loop) as runner:
+            runner.run(manager.run())
+    else:
+        # asyncio.Runner needs Python 3.11, older versions use uvloop's event loop policy
+        uvloop.install()
+        asyncio.run(manager.run())